@@ -2,8 +2,9 @@ import torch
 import numpy as np
 from numba import njit
 import math
+import functools
 
-from typing import Union, Optional
+from typing import Union, Optional, Tuple
 
 
 @njit()
@@ -211,6 +212,22 @@ def partition_nodes_by_n_edges(node_n_edges: Union[np.ndarray, torch.Tensor],
         num_zeros = (node_n_edges == 0).sum()
         node_n_edges = node_n_edges[num_zeros:]
 
+    # The partitioning only depends on the histogram of `node_n_edges`, which is shared by many layers 
+    # (e.g., all product layers of a homogeneous structure), so we cache the results by the histogram
+    unique_n_edges, counts = np.unique(node_n_edges, return_counts = True)
+    block_sizes = _partition_nodes_by_histogram(
+        tuple(unique_n_edges.tolist()), tuple(counts.tolist()), max_num_partitions, target_overhead, algorithm
+    )
+
+    return torch.tensor(block_sizes, dtype = torch.long)
+
+
+@functools.lru_cache(maxsize = 1024)
+def _partition_nodes_by_histogram(unique_n_edges: Tuple[int, ...], counts: Tuple[int, ...], max_num_partitions: int, 
+                                  target_overhead: Optional[int], algorithm: str):
+
+    node_n_edges = np.repeat(np.array(unique_n_edges, dtype = np.int64), np.array(counts, dtype = np.int64))
+
     if algorithm == "dp_simple":
         block_sizes, overhead = _partition_nodes_dp_simple(node_n_edges, max_num_partitions, target_overhead)
 
@@ -221,7 +238,4 @@ def partition_nodes_by_n_edges(node_n_edges: Union[np.ndarray, torch.Tensor],
     else:
         raise ValueError(f"Unknown algorithm {algorithm} for `partition_nodes_by_n_edges`.")
 
-    if isinstance(block_sizes, np.ndarray):
-        block_sizes = torch.from_numpy(block_sizes)
-
-    return torch.sort(block_sizes).values
\ No newline at end of file
+    return tuple(sorted(int(size) for size in block_sizes))
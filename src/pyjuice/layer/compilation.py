@@ -932,23 +932,23 @@ def prod_layer_forward_compilation(nodes, fw_partition_max_chs, n_partition_ids,
             local_eid = local_sid + ns.num_nodes
         partition_nchs = fw_partition_max_chs[partition_id]
 
+        # Global start index of every child node vector
+        cs_sids = torch.tensor([cs._output_ind_range[0] for cs in ns.chs], dtype = torch.long, device = device)
+
         if use_block_sparse_edges:
             n_sid = ns._output_ind_range[0]
             nids[partition_id][local_sid:local_eid] = torch.arange(0, ns.num_nodes, block_size, device = device) + n_sid
-            for cs_id, cs in enumerate(ns.chs):
-                cids[partition_id][local_sid:local_eid,cs_id] = ns.edge_ids[:,cs_id].to(device) * block_size + cs._output_ind_range[0]
+            cids[partition_id][local_sid:local_eid,:ns.num_chs] = ns.edge_ids.to(device) * block_size + cs_sids[None,:]
         else:
             n_sid = ns._output_ind_range[0]
             nids[partition_id][local_sid:local_eid] = torch.arange(0, ns.num_nodes, device = device) + n_sid
             if ns.is_sparse():
-                for cs_id, cs in enumerate(ns.chs):
-                    cids[partition_id][local_sid:local_eid,cs_id] = ns.edge_ids[:,cs_id].to(device) + cs._output_ind_range[0]
+                cids[partition_id][local_sid:local_eid,:ns.num_chs] = ns.edge_ids.to(device) + cs_sids[None,:]
             else:
                 assert ns.is_block_sparse()
-                edge_ids = ns.edge_ids.clone()
-                edge_ids = (edge_ids[:,None,:].repeat(1, ns.block_size, 1) * ns.block_size + torch.arange(0, ns.block_size)[None,:,None]).flatten(0, 1)
-                for cs_id, cs in enumerate(ns.chs):
-                    cids[partition_id][local_sid:local_eid,cs_id] = edge_ids[:,cs_id].to(device) + cs._output_ind_range[0]
+                edge_ids = ns.edge_ids.to(device)
+                edge_ids = (edge_ids[:,None,:] * ns.block_size + torch.arange(0, ns.block_size, device = device)[None,:,None]).flatten(0, 1)
+                cids[partition_id][local_sid:local_eid,:ns.num_chs] = edge_ids + cs_sids[None,:]
 
     if use_cuda:
         nids = [tensor.cpu() for tensor in nids]
@@ -970,8 +970,9 @@ def flatten_c_ids(nids: Sequence[torch.Tensor], cids: Sequence[torch.Tensor]):
         n_eid = n_sid + curr_nids.size(0)
         c_eid = c_sid + curr_cids.size(0) * curr_cids.size(1)
 
-        flat_cids[c_sid:c_eid] = curr_cids.reshape(-1)
-        flat_cid2nid[c_sid:c_eid] = curr_nids.unsqueeze(1).repeat(1, curr_cids.size(1)).reshape(-1)
+        # Write through row-major views of the target slices to avoid materializing temporary copies
+        flat_cids[c_sid:c_eid].view(curr_cids.size(0), curr_cids.size(1)).copy_(curr_cids)
+        flat_cid2nid[c_sid:c_eid].view(curr_cids.size(0), curr_cids.size(1)).copy_(curr_nids.unsqueeze(1).expand(-1, curr_cids.size(1)))
 
         n_sid = n_eid
         c_sid = c_eid
@@ -1172,18 +1173,32 @@ def prod_layer_backward_compilation(flat_u_cids, flat_cids, flat_cid2nid, bk_par
         u_cids = [torch.zeros([partition_size], dtype = torch.long) for partition_size in num_ns_in_partition] # Node block id
         parids = [torch.zeros([partition_size, max_n_pars], dtype = torch.long) for partition_size, max_n_pars in zip(num_ns_in_partition, bk_partition_max_pars)] # Parent block id
 
-        for idx in range(flat_u_cids.size(0)):
-            cid = flat_u_cids[idx]
-
-            # `partition_id`:   which partition the current node block belongs to
-            # `local_id`:       the index of the node block within the current partition
-            partition_id = n_partition_ids[idx]
-            local_id = n_id_in_partition[idx]
-
-            criterion = (flat_cids == cid)
-            npar = criterion.sum()
-
-            u_cids[partition_id][local_id] = cid
-            parids[partition_id][local_id,:npar] = flat_cid2nid[criterion]
+        # Sort the edges by their child ids such that the parents of every child node block form a contiguous segment
+        # Note: the sort is stable to keep the original order of the parents
+        order = torch.argsort(flat_cids, stable = True)
+        sorted_cids = flat_cids[order]
+        sorted_parids = flat_cid2nid[order]
+
+        # Strip away edges pointing to the dummy node
+        criterion = torch.isin(sorted_cids, flat_u_cids)
+        sorted_cids = sorted_cids[criterion]
+        sorted_parids = sorted_parids[criterion]
+
+        # `seg_ids`:     index of the child node block (in `flat_u_cids`) of every edge
+        # `par_offsets`: the `?` mark in `parids[partition_id][local_id,?]`
+        _, seg_counts = torch.unique_consecutive(sorted_cids, return_counts = True)
+        seg_ids = torch.repeat_interleave(torch.arange(seg_counts.size(0)), seg_counts)
+        seg_starts = torch.cumsum(seg_counts, dim = 0) - seg_counts
+        par_offsets = torch.arange(sorted_cids.size(0)) - seg_starts[seg_ids]
+
+        # `partition_id`:   which partition the node blocks belong to
+        # `local_id`:       the index of the node blocks within the corresponding partition
+        for partition_id in range(len(u_cids)):
+            criterion = (n_partition_ids == partition_id)
+            u_cids[partition_id][n_id_in_partition[criterion]] = flat_u_cids[criterion]
+
+            criterion = (n_partition_ids[seg_ids] == partition_id)
+            local_ids = n_id_in_partition[seg_ids[criterion]]
+            parids[partition_id][local_ids, par_offsets[criterion]] = sorted_parids[criterion]
 
     return u_cids, parids
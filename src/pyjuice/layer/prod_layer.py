@@ -16,11 +16,10 @@ else:
     tlmath = tl.math
 
 from pyjuice.nodes import ProdNodes
-from pyjuice.utils.parameter_list import FastParamList
+from pyjuice.utils.parameter_list import FastBufferList
 from pyjuice.utils.kernel_launcher import FastJITFunction
 from .layer import Layer
 from .backend.node_partition import partition_nodes_by_n_edges
-from .backend.index_set import batched_index_set, batched_index_cum
 from .compilation import next_power_of_2, get_prod_layer_stats, prod_layer_forward_compilation, \
                          flatten_c_ids, get_prod_layer_parstats, prod_layer_backward_compilation
 
@@ -98,9 +97,18 @@ class ProdLayer(Layer, nn.Module):
             self.block_size, self.use_block_sparse_edges
         )
 
+        # Store the index tensors as int32 whenever they fit to halve the memory traffic of index loads (the kernels 
+        # promote the loaded ids to int64 before computing offsets into `node_mars`/`element_mars`). Note that `nids` 
+        # are element ids while `cids` are global node ids, so we need to check both. `u_cids` and `parids` built below 
+        # only contain values taken from `cids` and `nids`, respectively. Since some kernels add the in-block offset to 
+        # the loaded ids before promoting them, `block_size` is included in the bound. Layers of the same circuit can 
+        # end up with different dtypes; `FastJITFunction` keys its kernel cache on tensor dtypes to handle this.
+        max_idx = max([tensor.max().item() for tensor in nids + cids if tensor.numel() > 0], default = 0)
+        idx_dtype = torch.int32 if max_idx + self.block_size < 2**31 else torch.long
+
         # Store buffers for the forward pass
-        self.partitioned_nids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in nids])
-        self.partitioned_cids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in cids])
+        self.partitioned_nids = FastBufferList([tensor.to(idx_dtype) for tensor in nids])
+        self.partitioned_cids = FastBufferList([tensor.to(idx_dtype) for tensor in cids])
 
         ## Initialize backward pass ##
 
@@ -154,8 +162,8 @@ class ProdLayer(Layer, nn.Module):
         )
 
         # Store buffers for the backward pass
-        self.partitioned_u_cids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in u_cids])
-        self.partitioned_parids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in parids])
+        self.partitioned_u_cids = FastBufferList([tensor.to(idx_dtype) for tensor in u_cids])
+        self.partitioned_parids = FastBufferList([tensor.to(idx_dtype) for tensor in parids])
 
     def forward(self, node_mars: torch.Tensor, element_mars: torch.Tensor, _for_backward: bool = False, **kwargs) -> None:
         """
@@ -287,7 +295,7 @@ class ProdLayer(Layer, nn.Module):
             # To make the triton compiler happy, we reload every index `BLOCK_M` times
             offs_ne = tl.arange(0, num_edges * BLOCK_M) // BLOCK_M
             offs_ne = tl.view(offs_ne, (BLOCK_M, num_edges))
-            offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_ne) # [BLOCK_M, num_edges]
+            offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_ne).to(tl.int64) # [BLOCK_M, num_edges]
 
             # Get the edge values from child nodes
             block_nids = tl.arange(0, BLOCK_M) + ntile_id * BLOCK_M
@@ -303,7 +311,7 @@ class ProdLayer(Layer, nn.Module):
                 nvals = tl.sum(evals, axis = 2)
 
             # Node ids to `node_vals_ptr`
-            nblock_start = tl.load(nids_ptr + nblock_id)
+            nblock_start = tl.load(nids_ptr + nblock_id).to(tl.int64)
             offs_nvals = (nblock_start + block_nids[None,:]) * batch_size + offs_batch[:,None]
 
             # Accumulate the `node_vals` if required
@@ -348,7 +356,7 @@ class ProdLayer(Layer, nn.Module):
             # Get the block start ids for the children
             offs_ne = tl.arange(0, num_edges * BLOCK_M) // BLOCK_M
             offs_ne = tl.view(offs_ne, (BLOCK_M, num_edges))
-            offs_egstart = tl.load(cids_ptr + nblock_ids[:,None] * num_edges + offs_ne, mask = mask_node[:,None]) # [BLOCK_M, num_edges]
+            offs_egstart = tl.load(cids_ptr + nblock_ids[:,None] * num_edges + offs_ne, mask = mask_node[:,None]).to(tl.int64) # [BLOCK_M, num_edges]
 
             # Get the edge values from child nodes
             block_nids = (offs_node % block_size)
@@ -364,7 +372,7 @@ class ProdLayer(Layer, nn.Module):
                 nvals = tl.sum(evals, axis = 2)
 
             # Node ids to `node_vals_ptr`
-            nblock_start = tl.load(nids_ptr + nblock_ids[None,:])
+            nblock_start = tl.load(nids_ptr + nblock_ids[None,:]).to(tl.int64)
             offs_nvals = (nblock_start + block_nids[None,:]) * batch_size + offs_batch[:,None]
 
             # Accumulate the `node_vals` if required
@@ -416,13 +424,13 @@ class ProdLayer(Layer, nn.Module):
 
         # Get the block start ids for the children
         offs_edge = tl.arange(0, num_edges)
-        offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_edge) # [num_edges]
+        offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_edge).to(tl.int64) # [num_edges]
 
         # Base ptr for ch values
         offs_evals = (offs_egstart[:,None] + ntile_id * BLOCK_M) * batch_size + offs_batch[None,:] # [num_edges, BLOCK_B]
 
         # Base ptr for par values
-        nblock_start = tl.load(nids_ptr + nblock_id)
+        nblock_start = tl.load(nids_ptr + nblock_id).to(tl.int64)
         offs_nvals = (nblock_start + ntile_id * BLOCK_M) * batch_size + offs_batch # [BLOCK_B]
 
         # Inner loop
@@ -491,13 +499,13 @@ class ProdLayer(Layer, nn.Module):
         # Get the block start ids for the children
         offs_edge = tl.arange(0, BLOCK_N)
         mask_edge = (offs_edge < num_edges)
-        offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_edge) # [BLOCK_N]
+        offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_edge, mask = mask_edge, other = 0).to(tl.int64) # [BLOCK_N]
 
         # Base ptr for ch values
         offs_evals = (offs_egstart[:,None] + ntile_id) * batch_size + offs_batch[None,:] # [BLOCK_N, BLOCK_B]
 
         # Base ptr for par values
-        nblock_start = tl.load(nids_ptr + nblock_id)
+        nblock_start = tl.load(nids_ptr + nblock_id).to(tl.int64)
         offs_nvals = (nblock_start + ntile_id) * batch_size + offs_batch # [BLOCK_B]
 
         # Prepare buffer
@@ -526,7 +534,7 @@ class ProdLayer(Layer, nn.Module):
             mask_edge = (offs_edge < num_edges)
 
             # Re-compute the ch value ids
-            offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_edge) # [BLOCK_N]
+            offs_egstart = tl.load(cids_ptr + nblock_id * num_edges + offs_edge, mask = mask_edge, other = 0).to(tl.int64) # [BLOCK_N]
             offs_evals = (offs_egstart[:,None] + ntile_id) * batch_size + offs_batch[None,:] # [BLOCK_N, BLOCK_B]
 
         # Accumulate the `node_vals` if required
@@ -586,7 +594,7 @@ class ProdLayer(Layer, nn.Module):
                 batch_size = batch_size, 
                 BLOCK_N = BLOCK_N, 
                 BLOCK_B = BLOCK_B, 
-                N_NUM_BLKS = triton.cdiv(num_edges, BLOCK_B), 
+                N_NUM_BLKS = triton.cdiv(num_edges, BLOCK_N), 
                 block_size = block_size, 
                 accum = accum, 
                 partial_eval = partial_eval,
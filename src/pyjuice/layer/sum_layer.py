@@ -18,11 +18,10 @@ else:
 
 from pyjuice.nodes import SumNodes
 from pyjuice.utils import BitSet
-from pyjuice.utils.parameter_list import FastParamList
+from pyjuice.utils.parameter_list import FastBufferList
 from pyjuice.utils.kernel_launcher import FastJITFunction
 from .layer import Layer
 from .backend.node_partition import partition_nodes_by_n_edges
-from .backend.index_set import batched_index_set, index_cum
 from .compilation import get_sum_layer_forward_stats, sum_layer_forward_compilation, \
                          get_sum_layer_backward_stats, \
                          sum_layer_backward_compilation, next_power_of_2
@@ -108,10 +107,10 @@ class SumLayer(Layer, nn.Module):
         )
 
         # Store buffers for the forward pass
-        self.partitioned_nids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in nids])
-        self.partitioned_cids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in cids])
-        self.partitioned_pids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in pids])
-        self.partitioned_pfids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in pfids])
+        self.partitioned_nids = FastBufferList(nids)
+        self.partitioned_cids = FastBufferList(cids)
+        self.partitioned_pids = FastBufferList(pids)
+        self.partitioned_pfids = FastBufferList(pfids)
 
         # Store pre-compiled indices from `cids` and `pids` in the following buffer
         self._cached_fw_pcids = dict()
@@ -187,9 +186,9 @@ class SumLayer(Layer, nn.Module):
             cs_block_sizes.extend([ch_gsize] * num_bk_partitions)
 
         # Store buffers for the forward pass
-        self.partitioned_chids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in chids])
-        self.partitioned_parids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in parids])
-        self.partitioned_parpids = FastParamList([nn.Parameter(tensor, requires_grad = False) for tensor in parpids])
+        self.partitioned_chids = FastBufferList(chids)
+        self.partitioned_parids = FastBufferList(parids)
+        self.partitioned_parpids = FastBufferList(parpids)
         self.cs_block_sizes = cs_block_sizes
 
         self.num_bk_partitions = len(chids)
@@ -1201,16 +1200,16 @@ class SumLayer(Layer, nn.Module):
 
         if propagation_alg_id == 0:
             maxval = ch_mars.max(dim = 1, keepdim = True).values
-            node_mars[nids] = (((ch_mars - maxval).exp() * params[pids].unsqueeze(-1)).sum(
-                dim = 1).clamp(min = 1e-10)).log() + maxval.squeeze(1)
+            node_mars.index_copy_(0, nids, (((ch_mars - maxval).exp() * params[pids].unsqueeze(-1)).sum(
+                dim = 1).clamp(min = 1e-10)).log() + maxval.squeeze(1))
 
         elif propagation_alg_id == 1:
-            node_mars[nids] = (ch_mars + params[pids].log().unsqueeze(-1)).max(dim = 1).values
+            node_mars.index_copy_(0, nids, (ch_mars + params[pids].log().unsqueeze(-1)).max(dim = 1).values)
 
         elif propagation_alg_id == 2:
             maxval = ch_mars.max(dim = 1, keepdim = True).values
-            node_mars[nids] = ((((ch_mars - maxval).exp() * params[pids].unsqueeze(-1)) ** alpha).sum(
-                dim = 1).clamp(min = 1e-10)).log() ** (1.0 / alpha) + maxval.squeeze(1)
+            node_mars.index_copy_(0, nids, ((((ch_mars - maxval).exp() * params[pids].unsqueeze(-1)) ** alpha).sum(
+                dim = 1).clamp(min = 1e-10)).log() ** (1.0 / alpha) + maxval.squeeze(1))
 
         return None
 
@@ -2985,8 +2984,7 @@ class SumLayer(Layer, nn.Module):
         if param_flows is not None and nids is not None:
             self._backward_pytorch_par_kernel(
                 node_flows, params, node_mars, element_mars, param_flows, 
-                nids, cids, pids, pfids, self.block_size, logspace_flows,
-                negate_pflows
+                nids, cids, pids, pfids, logspace_flows, negate_pflows
             )
 
     @torch.compile
@@ -3010,25 +3008,25 @@ class SumLayer(Layer, nn.Module):
         
         if logspace_flows:
             if accumulate_ch_flows:
-                element_flows[chids] += (node_flows[parids] + params[parpids].log().unsqueeze(-1) + \
-                    element_mars[chids].unsqueeze(1) - node_mars[parids]).logsumexp(dim = 1)
+                element_flows.index_add_(0, chids, (node_flows[parids] + params[parpids].log().unsqueeze(-1) + \
+                    element_mars[chids].unsqueeze(1) - node_mars[parids]).logsumexp(dim = 1))
             else:
-                element_flows[chids] = (node_flows[parids] + params[parpids].log().unsqueeze(-1) + \
-                    element_mars[chids].unsqueeze(1) - node_mars[parids]).logsumexp(dim = 1)
+                element_flows.index_copy_(0, chids, (node_flows[parids] + params[parpids].log().unsqueeze(-1) + \
+                    element_mars[chids].unsqueeze(1) - node_mars[parids]).logsumexp(dim = 1))
         else:
             if accumulate_ch_flows:
-                element_flows[chids] += (node_flows[parids] * params[parpids].unsqueeze(-1) * \
-                    (element_mars[chids].unsqueeze(1) - node_mars[parids]).exp()).sum(dim = 1)
+                element_flows.index_add_(0, chids, (node_flows[parids] * params[parpids].unsqueeze(-1) * \
+                    (element_mars[chids].unsqueeze(1) - node_mars[parids]).exp()).sum(dim = 1))
             else:
-                element_flows[chids] = (node_flows[parids] * params[parpids].unsqueeze(-1) * \
-                    (element_mars[chids].unsqueeze(1) - node_mars[parids]).exp()).sum(dim = 1)
+                element_flows.index_copy_(0, chids, (node_flows[parids] * params[parpids].unsqueeze(-1) * \
+                    (element_mars[chids].unsqueeze(1) - node_mars[parids]).exp()).sum(dim = 1))
 
         return None
 
     @torch.compile
     def _backward_pytorch_par_kernel(self, node_flows: torch.Tensor, params: torch.Tensor, node_mars: torch.Tensor, 
                                      element_mars: torch.Tensor, param_flows: torch.Tensor, nids: torch.Tensor, 
-                                     cids: torch.Tensor, pids: torch.Tensor, pfids: torch.Tensor, ns_block_size: int,
+                                     cids: torch.Tensor, pids: torch.Tensor, pfids: torch.Tensor,
                                      logspace_flows: bool, negate_pflows: bool):
 
         num_nblocks = nids.size(0)
@@ -3046,12 +3044,9 @@ class SumLayer(Layer, nn.Module):
         else:
             parflows = (node_flows[nids].unsqueeze(1) * params[pids].unsqueeze(-1) * (element_mars[cids] - node_mars[nids].unsqueeze(1)).exp()).sum(dim = 2)
 
-        for i in range(num_nblocks):
-            sid, eid = ns_block_size * i, ns_block_size * (i + 1)
-            if negate_pflows:
-                param_flows[pfids[sid:eid,:]] -= parflows[sid:eid,:]
-            else:
-                param_flows[pfids[sid:eid,:]] += parflows[sid:eid,:]
+        # `index_add_` accumulates duplicated indices (e.g., from tied parameters), so all node blocks 
+        # can be processed in a single call
+        param_flows.index_add_(0, pfids.reshape(-1), parflows.reshape(-1), alpha = -1.0 if negate_pflows else 1.0)
 
         return None
 
@@ -58,6 +58,16 @@ class FastJITFunction():
             if "batch_size" in kwargs:
                 signature_list.append(("batch_size", kwargs["batch_size"]))
 
+            # Pointer element types are baked into the compiled binary, so tensors with different 
+            # dtypes (e.g., int32 vs. int64 index tensors) must not share a cache entry
+            for arg in args:
+                if isinstance(arg, torch.Tensor):
+                    signature_list.append(arg.dtype)
+
+            for k, v in kwargs.items():
+                if isinstance(v, torch.Tensor):
+                    signature_list.append((k, v.dtype))
+
             if isinstance(grid, Callable):
                 grid = grid(kwargs)
 
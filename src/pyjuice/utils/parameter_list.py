@@ -1,12 +1,27 @@
 import torch
 import torch.nn as nn
-from typing import Iterator, Any
+from typing import Iterator, Sequence
 
 
-class FastParamList(nn.ParameterList):
+class FastBufferList(nn.Module):
+    """
+    A list of (non-trainable) tensors registered as buffers. They move with the parent module 
+    and appear in its `state_dict` (under keys `0`, `1`, ...), but are not returned by 
+    `parameters()` and carry no autograd metadata.
+    """
 
-    def __getitem__(self, idx) -> Any:
+    def __init__(self, tensors: Sequence[torch.Tensor]) -> None:
+        super(FastBufferList, self).__init__()
+
+        self._num_buffers = len(tensors)
+        for i, tensor in enumerate(tensors):
+            self.register_buffer(str(i), tensor)
+
+    def __getitem__(self, idx: int) -> torch.Tensor:
         return getattr(self, str(idx))
 
-    def __iter__(self) -> Iterator[Any]:
+    def __iter__(self) -> Iterator[torch.Tensor]:
         return iter(self[i] for i in range(len(self)))
+
+    def __len__(self) -> int:
+        return self._num_buffers
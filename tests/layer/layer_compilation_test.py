@@ -111,6 +111,50 @@ def test_sum_layer_compilation():
                         assert (parid, chid, pid) in ncpids, f"({parid}, {chid}, {pid})"
 
 
+def test_node_partition_cache():
+
+    from pyjuice.layer.backend.node_partition import partition_nodes_by_n_edges, _partition_nodes_by_histogram
+
+    _partition_nodes_by_histogram.cache_clear()
+
+    # The result only depends on the histogram of edge counts, not on the order of the nodes
+    partitions = partition_nodes_by_n_edges(torch.tensor([2, 2, 4, 4, 2, 2]), sparsity_tolerance = 0.5)
+    assert _partition_nodes_by_histogram.cache_info().misses == 1
+
+    partitions2 = partition_nodes_by_n_edges(torch.tensor([4, 2, 2, 2, 4, 2]), sparsity_tolerance = 0.5)
+    assert _partition_nodes_by_histogram.cache_info().hits == 1
+    assert torch.all(partitions == partitions2)
+
+    # Two product layers with the same histogram of the number of children
+    with juice.set_block_size(4):
+
+        ni0 = inputs(0, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+        ni1 = inputs(1, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+        ni2 = inputs(2, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+        ni3 = inputs(3, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+
+        np0 = multiply(ni0, ni1)
+        np1 = multiply(ni0, ni1, ni2, ni3)
+        np2 = multiply(ni2, ni3)
+
+        np3 = multiply(ni1, ni2)
+        np4 = multiply(ni3, ni2, ni1, ni0)
+        np5 = multiply(ni0, ni3)
+
+    input_layer = InputLayer([ni0, ni1, ni2, ni3], cum_nodes = 4)
+
+    layer0 = ProdLayer([np0, np1, np2], layer_sparsity_tol = 0.5)
+    num_hits = _partition_nodes_by_histogram.cache_info().hits
+
+    layer1 = ProdLayer([np3, np4, np5], layer_sparsity_tol = 0.5)
+    assert _partition_nodes_by_histogram.cache_info().hits > num_hits
+
+    assert layer0.num_fw_partitions == layer1.num_fw_partitions
+    for cids0, cids1 in zip(layer0.partitioned_cids, layer1.partitioned_cids):
+        assert cids0.size() == cids1.size()
+
+
 if __name__ == "__main__":
     test_prod_layer_compilation()
     test_sum_layer_compilation()
+    test_node_partition_cache()
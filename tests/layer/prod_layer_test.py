@@ -10,6 +10,7 @@ from pyjuice.nodes import multiply, summate, inputs
 from pyjuice.model import TensorCircuit
 
 from pyjuice.layer import InputLayer, ProdLayer
+from pyjuice.utils.parameter_list import FastBufferList
 
 import pytest
 
@@ -91,6 +92,159 @@ def test_prod_layer():
             assert torch.all(torch.abs(node_flows[8*block_size+i,:] - element_flows[4*block_size+i,:]) < 1e-4)
 
 
+def test_prod_layer_index_dtype():
+
+    block_size = 4
+
+    # Place the child nodes below and above 2**31 so that `cids` decides the dtype
+    for input_start, target_dtype in [(block_size, torch.int32), (2**31, torch.long)]:
+
+        with juice.set_block_size(block_size):
+
+            ni0 = inputs(0, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+            ni1 = inputs(1, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+            ni2 = inputs(2, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+            ni3 = inputs(3, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+
+            np0 = multiply(ni0, ni1)
+            np1 = multiply(ni2, ni3)
+            np2 = multiply(ni1, ni2)
+
+        input_layer = InputLayer([ni0, ni1, ni2, ni3], cum_nodes = input_start)
+
+        layer = ProdLayer([np0, np1, np2])
+
+        assert layer.num_fw_partitions == 1 and layer.num_bk_partitions == 1
+
+        for tensor in [layer.partitioned_nids[0], layer.partitioned_cids[0], layer.partitioned_u_cids[0], layer.partitioned_parids[0]]:
+            assert tensor.dtype == target_dtype
+
+        ref_nids = torch.arange(block_size, 7 * block_size, block_size)
+        ref_cids = input_start + block_size * torch.tensor([[0, 2], [1, 3], [4, 6], [5, 7], [2, 4], [3, 5]])
+        ref_u_cids = input_start + block_size * torch.arange(0, 8)
+        ref_parids = block_size * torch.tensor([[1, 0], [2, 0], [1, 5], [2, 6], [3, 5], [4, 6], [3, 0], [4, 0]])
+
+        assert torch.all(layer.partitioned_nids[0].long() == ref_nids)
+        assert torch.all(layer.partitioned_cids[0].long() == ref_cids)
+        assert torch.all(layer.partitioned_u_cids[0].long() == ref_u_cids)
+        assert torch.all(layer.partitioned_parids[0].long() == ref_parids)
+
+
+def test_prod_layer_mixed_index_dtypes():
+
+    device = torch.device("cuda:0")
+
+    block_size = 4
+    batch_size = 16
+
+    with juice.set_block_size(block_size):
+
+        ni0 = inputs(0, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+        ni1 = inputs(1, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+        ni2 = inputs(2, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+        ni3 = inputs(3, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+
+        np0 = multiply(ni0, ni1)
+        np1 = multiply(ni2, ni3)
+        np2 = multiply(ni1, ni2)
+
+    input_layer = InputLayer([ni0, ni1, ni2, ni3], cum_nodes = block_size)
+
+    # Two identical layers, one of which uses int64 index tensors (as it would if its ids exceeded 2**31). 
+    # The kernels compiled for the int32 layer must not be reused for the int64 one
+    layer32 = ProdLayer([np0, np1, np2])
+    layer64 = ProdLayer([np0, np1, np2])
+    for name in ["partitioned_nids", "partitioned_cids", "partitioned_u_cids", "partitioned_parids"]:
+        setattr(layer64, name, FastBufferList([tensor.long() for tensor in getattr(layer64, name)]))
+
+    assert layer32.partitioned_cids[0].dtype == torch.int32
+    assert layer64.partitioned_cids[0].dtype == torch.long
+
+    layer32.to(device)
+    layer64.to(device)
+
+    offsets = torch.arange(0, block_size, device = device)
+    ref_nids = torch.arange(block_size, 7 * block_size, block_size, device = device)
+    ref_cids = block_size + block_size * torch.tensor([[0, 2], [1, 3], [4, 6], [5, 7], [2, 4], [3, 5]], device = device)
+    ref_u_cids = block_size + block_size * torch.arange(0, 8, device = device)
+    ref_parids = block_size * torch.tensor([[1, 0], [2, 0], [1, 5], [2, 6], [3, 5], [4, 6], [3, 0], [4, 0]], device = device)
+
+    node_mars = torch.rand([block_size + block_size * 2 * 4, batch_size]).log().to(device)
+    element_flows = torch.rand([block_size + 3 * 2 * 2 * block_size, batch_size]).to(device)
+    element_flows[:block_size,:] = 0.0
+
+    for layer in [layer32, layer64, layer32]:
+
+        ## Forward tests ##
+
+        element_mars = torch.zeros([block_size + 3 * 2 * 2 * block_size, batch_size]).to(device)
+        layer(node_mars, element_mars)
+
+        ref_element_mars = node_mars[ref_cids[:,None,:] + offsets[None,:,None]].sum(dim = 2)
+        assert torch.all(torch.abs(element_mars[ref_nids[:,None] + offsets[None,:]] - ref_element_mars) < 1e-4)
+
+        ## Backward tests ##
+
+        node_flows = torch.zeros([block_size + block_size * 2 * 4, batch_size]).to(device)
+        layer.backward(node_flows, element_flows)
+
+        ref_node_flows = element_flows[ref_parids[:,None,:] + offsets[None,:,None]].sum(dim = 2)
+        assert torch.all(torch.abs(node_flows[ref_u_cids[:,None] + offsets[None,:]] - ref_node_flows) < 1e-4)
+
+
+def test_prod_layer_large_partition():
+
+    device = torch.device("cuda:0")
+
+    batch_size = 16
+    num_vars = 4097
+
+    with juice.set_block_size(1):
+
+        nis = []
+        for v in range(num_vars):
+            nis.append(inputs(v, num_node_blocks = 1, dist = dists.Categorical(num_cats = 2)))
+
+        # A product node with 4096 children (forward partition with > 2048 edges) and
+        # a child node with 4096 parents (backward partition with > 2048 edges)
+        nps = [multiply(*nis[1:])]
+        for v in range(1, num_vars):
+            nps.append(multiply(nis[0], nis[v]))
+
+    input_layer = InputLayer(nis, cum_nodes = 1)
+
+    layer = ProdLayer(nps, layer_sparsity_tol = 0.1)
+
+    assert max([cids.size(1) for cids in layer.partitioned_cids]) > 2048
+    assert max([parids.size(1) for parids in layer.partitioned_parids]) > 2048
+
+    layer.to(device)
+
+    ## Forward tests ##
+
+    node_mars = torch.rand([1 + num_vars, batch_size]).log().to(device)
+    node_mars[0,:] = 0.0
+    element_mars = torch.zeros([1 + len(nps), batch_size]).to(device)
+
+    layer(node_mars, element_mars)
+
+    for nids, cids in zip(layer.partitioned_nids, layer.partitioned_cids):
+        ref_element_mars = node_mars[cids.long()].sum(dim = 1)
+        assert torch.allclose(element_mars[nids.long()], ref_element_mars, rtol = 1e-4, atol = 1e-4)
+
+    ## Backward tests (logspace flows) ##
+
+    element_flows = torch.rand([1 + len(nps), batch_size]).log().to(device)
+    element_flows[0,:] = -float("inf")
+    node_flows = torch.zeros([1 + num_vars, batch_size]).to(device) - float("inf")
+
+    layer.backward(node_flows, element_flows, logspace_flows = True)
+
+    for u_cids, parids in zip(layer.partitioned_u_cids, layer.partitioned_parids):
+        ref_node_flows = element_flows[parids.long()].logsumexp(dim = 1)
+        assert torch.allclose(node_flows[u_cids.long()], ref_node_flows, rtol = 1e-4, atol = 1e-4)
+
+
 @pytest.mark.slow
 def test_speed():
 
@@ -168,4 +322,7 @@ def test_speed():
 if __name__ == "__main__":
     torch.manual_seed(2390)
     test_prod_layer()
+    test_prod_layer_index_dtype()
+    test_prod_layer_mixed_index_dtypes()
+    test_prod_layer_large_partition()
     test_speed()
@@ -6,6 +6,7 @@ import pyjuice.nodes.distributions as dists
 from pyjuice.utils import BitSet
 from pyjuice.nodes import multiply, summate, inputs
 from pyjuice.model import TensorCircuit
+from pyjuice.layer import ProdLayer, SumLayer
 
 import pytest
 
@@ -59,5 +60,52 @@ def test_tensorcircuit_fns():
     assert (m2_flows == pc.element_flows[nsid:neid,:]).all()
 
 
+def test_index_buffers():
+
+    ni0 = inputs(0, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+    ni1 = inputs(1, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+    ni2 = inputs(2, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+    ni3 = inputs(3, num_node_blocks = 2, dist = dists.Categorical(num_cats = 2))
+
+    m1 = multiply(ni0, ni1, edge_ids = torch.tensor([[0, 0], [0, 1], [1, 0], [1, 1]], dtype = torch.long))
+    n1 = summate(m1, edge_ids = torch.tensor([[0, 0, 0, 0, 1, 1, 1, 1], [0, 1, 2, 3, 0, 1, 2, 3]], dtype = torch.long))
+
+    m2 = multiply(ni2, ni3, edge_ids = torch.tensor([[0, 0], [1, 1]], dtype = torch.long))
+    n2 = summate(m2, edge_ids = torch.tensor([[0, 0, 1, 1], [0, 1, 0, 1]], dtype = torch.long))
+
+    m = multiply(n1, n2, edge_ids = torch.tensor([[0, 0], [1, 1]], dtype = torch.long))
+    n = summate(m, edge_ids = torch.tensor([[0, 0], [0, 1]], dtype = torch.long))
+
+    pc = TensorCircuit(n)
+
+    layers = [(name, module) for name, module in pc.named_modules() if isinstance(module, (ProdLayer, SumLayer))]
+    assert len(layers) > 0
+
+    # Index tensors are buffers rather than parameters
+    param_ids = set(id(param) for param in pc.parameters())
+    for _, layer in layers:
+        for tensor_list in (layer.partitioned_nids, layer.partitioned_cids):
+            for tensor in tensor_list:
+                assert id(tensor) not in param_ids
+    assert all(param.is_floating_point() for param in pc.parameters())
+
+    # The `state_dict` keys are unchanged
+    state_dict = pc.state_dict()
+    for name, layer in layers:
+        for i in range(len(layer.partitioned_nids)):
+            assert torch.all(state_dict[f"{name}.partitioned_nids.{i}"] == layer.partitioned_nids[i])
+            assert torch.all(state_dict[f"{name}.partitioned_cids.{i}"] == layer.partitioned_cids[i])
+
+    # Buffers follow the module across devices
+    device = torch.device("cuda:0")
+    pc.to(device)
+
+    for _, layer in layers:
+        for tensor_list in (layer.partitioned_nids, layer.partitioned_cids):
+            for tensor in tensor_list:
+                assert tensor.device == device
+
+
 if __name__ == "__main__":
-    test_tensorcircuit_fns()
\ No newline at end of file
+    test_tensorcircuit_fns()
+    test_index_buffers()
@@ -612,7 +612,75 @@ def test_simple_structure_block16():
     assert torch.all(torch.abs(param_flows1.reshape(-1) - ref_params1.cpu()) < 1e-4)
 
 
+def test_pytorch_mode_block16():
+
+    torch.manual_seed(892910)
+
+    block_size = 16
+    
+    with set_block_size(block_size = block_size):
+
+        ni0 = inputs(0, num_node_blocks = 2, dist = dists.Categorical(num_cats = 5))
+        ni1 = inputs(1, num_node_blocks = 2, dist = dists.Categorical(num_cats = 5))
+        ni2 = inputs(2, num_node_blocks = 2, dist = dists.Categorical(num_cats = 5))
+        ni3 = inputs(3, num_node_blocks = 2, dist = dists.Categorical(num_cats = 5))
+
+        np01 = multiply(ni0, ni1)
+        np12 = multiply(ni1, ni2)
+        np23 = multiply(ni2, ni3)
+
+        ns01 = summate(np01, num_node_blocks = 2)
+        ns12 = ns01.duplicate(np12, tie_params = True)
+        ns23 = ns01.duplicate(np23, tie_params = True)
+
+        np012_0 = multiply(ns01, ni2)
+        np012_1 = multiply(ns12, ni0)
+        ns012 = summate(np012_0, np012_1, num_node_blocks = 2)
+
+        np123_0 = multiply(ns12, ni3)
+        np123_1 = multiply(ns23, ni1)
+        ns123 = ns012.duplicate(np123_0, np123_1, tie_params = True)
+
+        np0123_0 = multiply(ns012, ni3)
+        np0123_1 = multiply(ns123, ni0)
+        ns0123 = ns123.duplicate(np0123_0, np0123_1, tie_params = True)
+
+    pc = TensorCircuit(ns0123, max_tied_ns_per_parflow_block = 2)
+
+    device = torch.device("cuda:0")
+    pc.to(device)
+
+    data = torch.randint(0, 5, [16, 4]).to(device)
+
+    ## Block-sparse reference ##
+
+    lls = pc(data, mode = "block_sparse", force_use_fp32 = True)
+    pc.backward(data, flows_memory = 0.0, allow_modify_flows = False, mode = "block_sparse")
+
+    ref_node_mars = pc.node_mars.clone()
+    ref_node_flows = pc.node_flows.clone()
+    ref_element_flows = pc.element_flows.clone()
+    ref_param_flows = pc.param_flows.clone()
+
+    ## Native PyTorch implementation ##
+
+    lls = pc(data, mode = "pytorch")
+    pc.backward(data, flows_memory = 0.0, allow_modify_flows = False, mode = "pytorch")
+
+    assert torch.all(torch.abs(pc.node_mars - ref_node_mars) < 1e-3)
+    assert torch.all(torch.abs(pc.node_flows - ref_node_flows) < 1e-3)
+    assert torch.all(torch.abs(pc.element_flows - ref_element_flows) < 1e-3)
+    assert torch.all(torch.abs(pc.param_flows - ref_param_flows) < 1e-2)
+
+    ## Negated parameter flows ##
+
+    pc.backward(data, flows_memory = 0.0, allow_modify_flows = False, negate_pflows = True, mode = "pytorch")
+
+    assert torch.all(torch.abs(pc.param_flows + ref_param_flows) < 1e-2)
+
+
 if __name__ == "__main__":
     torch.manual_seed(2390)
     test_simple_structure_block1()
     test_simple_structure_block16()
+    test_pytorch_mode_block16()